@@ -1,6 +1,38 @@
+from collections.abc import Awaitable, Callable
+
 from astrbot.api.event import AstrMessageEvent
 
-from .rpc_client import BaseParameters, BaseResponse, CallResponse, get_rpc_client
+from .rpc_client import (
+    BaseParameters,
+    BaseResponse,
+    CallResponse,
+    TResponse,
+    get_rpc_client,
+)
+
+
+def _make_rpc(
+    method: str, resp_model: type[TResponse], *, trusted: bool = False
+) -> Callable[..., Awaitable[CallResponse[TResponse]]]:
+    """生成调用指定 RPC 方法的类方法实现.
+
+    模块 ID 在调用时从 cls.module_id 读取，子类覆盖 module_id 后同样生效。
+    trusted 含义同 RPCClient.call，只应对字段均为基础类型的响应模型开启。
+    """
+
+    async def rpc(
+        cls, params: BaseParameters, *, event: AstrMessageEvent
+    ) -> CallResponse[TResponse]:
+        return await get_rpc_client().call(
+            module_id=cls.module_id,
+            method=method,
+            params=params,
+            unified_msg_origin=event.unified_msg_origin,
+            resp_model=resp_model,
+            trusted=trusted,
+        )
+
+    return rpc
 
 
 # ------------------- TestModule -------------------
@@ -15,28 +47,7 @@ class TestResponse(BaseResponse):
 class Testmodule:
     module_id = "test_module"
 
-    @classmethod
-    async def test_function(
-        cls, params: TestParameters, *, event: AstrMessageEvent
-    ) -> CallResponse[TestResponse]:
-        client = get_rpc_client()
-        return await client.call(
-            module_id=cls.module_id,
-            method="test_function",
-            params=params,
-            unified_msg_origin=event.unified_msg_origin,
-            resp_model=TestResponse,
-        )
-
-    @classmethod
-    async def test_function2(
-        cls, params: TestParameters, *, event: AstrMessageEvent
-    ) -> CallResponse[TestResponse]:
-        client = get_rpc_client()
-        return await client.call(
-            module_id=cls.module_id,
-            method="test_function2",
-            params=params,
-            unified_msg_origin=event.unified_msg_origin,
-            resp_model=TestResponse,
-        )
+    test_function = classmethod(_make_rpc("test_function", TestResponse, trusted=True))
+    test_function2 = classmethod(
+        _make_rpc("test_function2", TestResponse, trusted=True)
+    )
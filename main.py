@@ -1,8 +1,12 @@
+import asyncio
+import importlib.util
+
 from astrbot.api import logger
 from astrbot.api.event import AstrMessageEvent, filter
 from astrbot.api.star import Context, Star, register
 
 from .api import Testmodule, TestParameters
+from .rpc_client import get_rpc_client
 
 
 @register("插件测试", "kutake", "测试插件", "1.0.0")
@@ -12,6 +16,13 @@ class MyPlugin(Star):
 
     async def initialize(self):
         """可选择实现异步的插件初始化方法，当实例化该插件类之后会自动调用该方法。"""
+        # 事件循环由 AstrBot 创建，插件无法在运行中切换，这里只提示 uvloop 是否生效
+        if type(asyncio.get_running_loop()).__module__.startswith("uvloop"):
+            logger.info("RPC 客户端运行于 uvloop 事件循环")
+        elif importlib.util.find_spec("uvloop") is not None:
+            logger.info(
+                "已安装 uvloop，但 AstrBot 未以 uvloop 启动，RPC 使用默认事件循环"
+            )
 
     # 注册指令的装饰器。指令名为 helloworld。注册成功后，发送 `/helloworld` 就会触发这个指令，并回复 `你好, {user_name}!`
     @filter.permission_type(filter.PermissionType.ADMIN)
@@ -43,3 +54,4 @@ class MyPlugin(Star):
 
     async def terminate(self):
         """可选择实现异步的插件销毁方法，当插件被卸载/停用时会调用。"""
+        await get_rpc_client().aclose()
@@ -1,15 +1,48 @@
 import asyncio
 import contextlib
+import datetime
+import enum
+import functools
+import struct
+import uuid
+from collections.abc import Awaitable, Callable, Sequence
 from pathlib import Path
-from typing import Generic, TypeVar
+from types import ModuleType
+from typing import Generic, NamedTuple, TypeVar
 
 import msgpack
 from astrbot.api import logger
 from pydantic import BaseModel, Field
 
+ormsgpack: ModuleType | None
+try:
+    import ormsgpack
+except ImportError:
+    # 未安装 ormsgpack 时回退到 msgpack，由 _pack_default 保持线上格式一致
+    ormsgpack = None
+
 # class ResponseError(BaseException): ...
 
 
+class RPCClientClosedError(RuntimeError):
+    """RPC 客户端已关闭，不会再重连."""
+
+
+DEFAULT_SOCKET_PATH = Path("/run/logic/logic.sock")
+
+# 单次合并写入的最大字节数，超过后剩余请求留到下一次写入
+_MAX_BATCH_BYTES = 64 * 1024
+
+# 帧头：请求 ID 与负载长度，均为 4 字节大端无符号整数
+_HDR = struct.Struct(">II")
+
+# 同时等待响应的请求数上限
+_MAX_INFLIGHT = 1024
+
+# 等待（重新）建立连接的超时时间，单位为秒
+_CONNECT_TIMEOUT = 1.0
+
+
 class BaseParameters(BaseModel):
     """基础参数模型.
 
@@ -45,6 +78,7 @@ class BaseResponse(BaseModel):
 
 
 TResponse = TypeVar("TResponse", bound=BaseResponse)
+T = TypeVar("T")
 
 
 class CallResponse(BaseModel, Generic[TResponse]):
@@ -63,29 +97,105 @@ class CallResponse(BaseModel, Generic[TResponse]):
     error_message: str = Field(..., description="错误信息，如果有的话")
 
 
+def _pack_default(obj: object) -> object:
+    """序列化器遇到无法直接处理的对象时的回调.
+
+    pydantic 模型交给模型自身的序列化器，结果与 model_dump() 相同
+    （遵循 exclude、computed_field 和自定义 serializer）。时间类型转为
+    isoformat，UUID 转为字符串，枚举取值，与 ormsgpack 的原生处理一致，
+    保证两种序列化器产生的字节相同。
+    """
+    if isinstance(obj, BaseModel):
+        return obj.__pydantic_serializer__.to_python(obj)
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    raise TypeError(f"Cannot serialize {type(obj)!r}")
+
+
+class RPCCall(NamedTuple):
+    """批量调用中的单个请求.
+
+    Attributes:
+        module_id: 模块 ID
+        method: 要调用的方法名称
+        params: 方法调用的参数
+        resp_model: 响应数据的模型类型
+    """
+
+    module_id: str
+    method: str
+    params: BaseParameters
+    resp_model: type[BaseResponse]
+
+
 class RPCClient:
-    def __init__(self, socket_path: Path = Path("/run/logic/logic.sock")):
+    def __init__(
+        self,
+        socket_path: Path = DEFAULT_SOCKET_PATH,
+        timeout: float = 30.0,
+    ):
         self.socket_path = socket_path
+        self.timeout = timeout
 
         self._reader: asyncio.StreamReader | None = None
         self._writer: asyncio.StreamWriter | None = None
 
         self._req_id: int = 0
-        self._write_lock = asyncio.Lock()
+        # 参数模型由 _pack_default 在序列化过程中转换，调用方无需先 model_dump
+        self._pack: Callable[[object], bytes] = (
+            functools.partial(ormsgpack.packb, default=_pack_default)
+            if ormsgpack is not None
+            else msgpack.Packer(use_bin_type=True, default=_pack_default).pack
+        )
+        self._send_queue: asyncio.Queue[tuple[int, bytes]] | None = None
+        self._send_buf = bytearray()
         self._pending: dict[int, asyncio.Future] = {}
+        self._inflight = asyncio.Semaphore(_MAX_INFLIGHT)
 
         self._reader_task: asyncio.Task | None = None
+        self._writer_task: asyncio.Task | None = None
+        self._connect_task: asyncio.Task | None = None
+        self._closed = False
 
     async def connect(self):
-        if self._reader is not None:
+        if self._closed:
+            raise RPCClientClosedError("RPC client closed")
+        if self._writer is not None:
             return
 
+        if self._connect_task is None or self._connect_task.done():
+            self._connect_task = asyncio.create_task(self._open_connection())
+        # 连接任务由所有调用方共享，shield 避免单个调用方超时或取消时打断它
+        await asyncio.wait_for(asyncio.shield(self._connect_task), _CONNECT_TIMEOUT)
+
+    async def _open_connection(self):
         self._reader, self._writer = await asyncio.open_unix_connection(  # type: ignore
             self.socket_path
         )
+        self._send_queue = asyncio.Queue()
         self._reader_task = asyncio.create_task(self._read_loop())
+        self._writer_task = asyncio.create_task(self._write_loop())
+
+    async def aclose(self):
+        """关闭连接，未完成的请求将以异常结束，关闭后客户端不可再使用."""
+        self._closed = True
+        if self._connect_task is not None:
+            self._connect_task.cancel()
+        writer = self._writer
+        self._reset_connection(RPCClientClosedError("RPC client closed"))
+        if writer is not None:
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
 
     def _reset_connection(self, exc: Exception | None = None):
+        current = asyncio.current_task()
+        for task in (self._reader_task, self._writer_task):
+            if task is not None and task is not current:
+                task.cancel()
         if self._writer:
             with contextlib.suppress(Exception):
                 self._writer.close()
@@ -96,7 +206,9 @@ class RPCClient:
         self._pending.clear()
         self._reader = None
         self._writer = None
+        self._send_queue = None
         self._reader_task = None
+        self._writer_task = None
 
     async def _read_loop(self):
         reader = self._reader
@@ -104,18 +216,61 @@ class RPCClient:
 
         try:
             while True:
-                req_id = int.from_bytes(await reader.readexactly(4), "big")
-                size = int.from_bytes(await reader.readexactly(4), "big")
-                data = msgpack.unpackb(
-                    await reader.readexactly(size),
-                    raw=False,
-                )
+                req_id, size = _HDR.unpack(await reader.readexactly(_HDR.size))
+                payload = await reader.readexactly(size)
+                # 每帧单独解码，帧内残留的数据不会被当作下一帧的响应
+                if ormsgpack is not None:
+                    data = ormsgpack.unpackb(payload)
+                else:
+                    data = msgpack.unpackb(payload, raw=False)
 
                 fut = self._pending.pop(req_id, None)
                 if fut and not fut.done():
                     fut.set_result(data)
 
-        except asyncio.IncompleteReadError as e:
+        except Exception as e:  # noqa: BLE001 - 任何读取/解码失败都必须重置连接
+            # 读取或解码失败后连接已不可用，必须重置，否则后续调用会一直等到超时
+            self._reset_connection(e)
+
+    async def _write_loop(self):
+        writer = self._writer
+        queue = self._send_queue
+        assert writer is not None and queue is not None
+
+        try:
+            while True:
+                item = await queue.get()
+                buf = self._send_buf
+                size = 0
+                # 把同一轮事件循环中已就绪的请求合并写入复用的发送缓冲区
+                while True:
+                    req_id, payload = item
+                    end = size + _HDR.size + len(payload)
+                    if end > len(buf):
+                        # 不在原缓冲区上扩容：发送失败时异常回溯可能仍持有它的视图，
+                        # 扩容会抛出 BufferError，因此改为换一块更大的缓冲区
+                        grown = bytearray(max(end, len(buf) * 2))
+                        grown[:size] = buf[:size]
+                        buf = self._send_buf = grown
+                    _HDR.pack_into(buf, size, req_id, len(payload))
+                    buf[size + _HDR.size : end] = payload
+                    size = end
+
+                    if queue.empty() or size >= _MAX_BATCH_BYTES:
+                        break
+                    item = queue.get_nowait()
+
+                writer.write(memoryview(buf)[:size])
+                # 传输层可能仍引用这块缓冲区，换一块新的以免被下次写入覆盖；
+                # 发送过超大帧后同样换掉，避免长期占用内存
+                if (
+                    writer.transport.get_write_buffer_size()
+                    or len(buf) > _MAX_BATCH_BYTES * 2
+                ):
+                    self._send_buf = bytearray()
+                await writer.drain()
+
+        except Exception as e:  # noqa: BLE001 - 写入任务退出后连接不可再用，必须重置
             self._reset_connection(e)
 
     async def call(
@@ -126,70 +281,219 @@ class RPCClient:
         params: BaseParameters,
         unified_msg_origin: str,
         resp_model: type[TResponse],
+        trusted: bool = False,
     ) -> CallResponse[TResponse]:
+        """发起 RPC 调用.
+
+        Args:
+            module_id: 模块 ID
+            method: 要调用的方法名称
+            params: 方法调用的参数
+            unified_msg_origin: 会话的唯一 ID 标识符
+            resp_model: 响应数据的模型类型
+            trusted: 信任服务端返回的数据，成功时用 model_construct 构造响应数据
+                而不做校验。仅适用于字段均为基础类型的响应模型
+
+        Returns:
+            方法调用的响应
+        """
+        return await self._with_retry(
+            lambda: self._call_once(
+                module_id=module_id,
+                method=method,
+                params=params,
+                unified_msg_origin=unified_msg_origin,
+                resp_model=resp_model,
+                trusted=trusted,
+            )
+        )
+
+    async def call_many(
+        self,
+        calls: Sequence[RPCCall],
+        *,
+        unified_msg_origin: str,
+        trusted: bool = False,
+    ) -> list[CallResponse]:
+        """批量发起 RPC 调用.
+
+        所有请求在等待任何响应之前一次性提交，由写入任务合并发送，
+        总耗时约为一次往返。
+
+        Args:
+            calls: 要发起的调用列表
+            unified_msg_origin: 会话的唯一 ID 标识符
+            trusted: 同 call 的 trusted 参数
+
+        Returns:
+            与 calls 顺序一致的响应列表
+        """
+        return await self._with_retry(
+            lambda: self._call_many_once(
+                calls, unified_msg_origin=unified_msg_origin, trusted=trusted
+            )
+        )
+
+    async def _with_retry(self, once: Callable[[], Awaitable[T]]) -> T:
         for attempt in (1, 2):
             try:
-                await self.connect()
-                return await self._call_once(
-                    module_id=module_id,
-                    method=method,
-                    params=params,
-                    unified_msg_origin=unified_msg_origin,
-                    resp_model=resp_model,
-                )
-            except (BrokenPipeError, RuntimeError, ConnectionRefusedError) as e:
+                # 超时后取消等待中的请求，由请求完成回调将其移出 _pending
+                async with asyncio.timeout(self.timeout):
+                    await self.connect()
+                    return await once()
+            except RPCClientClosedError:
+                raise
+            except (
+                ConnectionError,
+                RuntimeError,
+                asyncio.IncompleteReadError,
+            ) as e:
                 logger.error(f"RPC server error: {e}")
                 self._reset_connection(e)
 
                 if attempt == 2:
                     raise e
-                await asyncio.sleep(5)
         raise RuntimeError("RPC server unavailable")
 
-    async def _call_once(
+    async def _submit(
         self,
         *,
         module_id: str,
         method: str,
         params: BaseParameters,
         unified_msg_origin: str,
-        resp_model: type[TResponse],
-    ) -> CallResponse[TResponse]:
-        await self.connect()
+    ) -> asyncio.Future:
+        # 直接构造与 CallParameters 字段一致的字典，跳过 pydantic 的校验与序列化
+        payload = self._pack(
+            {
+                "module_id": module_id,
+                "unified_msg_origin": unified_msg_origin,
+                "method": method,
+                "params": params,
+            }
+        )
+
+        # 限制未完成请求数量，服务端卡住时调用方在此等待而不是无限堆积
+        await self._inflight.acquire()
+        if self._send_queue is None:
+            self._inflight.release()
+            raise RuntimeError("connection reset")
 
-        self._req_id += 1
+        # 请求 ID 在线上只有 4 字节，超出后回绕
+        self._req_id = (self._req_id + 1) & 0xFFFFFFFF
         req_id = self._req_id
 
         loop = asyncio.get_running_loop()
         future = loop.create_future()
+        future.add_done_callback(functools.partial(self._on_request_done, req_id))
         self._pending[req_id] = future
 
-        req = CallParameters(
+        self._send_queue.put_nowait((req_id, payload))
+        return future
+
+    def _on_request_done(self, req_id: int, future: asyncio.Future):
+        self._inflight.release()
+        if self._pending.get(req_id) is future:
+            del self._pending[req_id]
+
+    @staticmethod
+    def _build_response(
+        data: dict, resp_model: type[TResponse], trusted: bool
+    ) -> CallResponse[TResponse]:
+        response_model = CallResponse[resp_model]
+        if not data["ok"]:
+            return response_model(**data)
+
+        # 成功时只校验业务数据，响应外壳直接构造
+        result = data["data"]
+        if result is not None:
+            result = (
+                resp_model.model_construct(**result)
+                if trusted
+                else resp_model.model_validate(result)
+            )
+        return response_model.model_construct(
+            ok=True,
+            unified_msg_origin=data["unified_msg_origin"],
+            data=result,
+            error_message=data["error_message"],
+        )
+
+    async def _call_once(
+        self,
+        *,
+        module_id: str,
+        method: str,
+        params: BaseParameters,
+        unified_msg_origin: str,
+        resp_model: type[TResponse],
+        trusted: bool,
+    ) -> CallResponse[TResponse]:
+        await self.connect()
+
+        future = await self._submit(
             module_id=module_id,
             method=method,
-            params=params.model_dump(),
+            params=params,
             unified_msg_origin=unified_msg_origin,
         )
-
-        payload = msgpack.packb(req.model_dump(), use_bin_type=True)
-
-        async with self._write_lock:
-            assert self._writer is not None
-            self._writer.write(req_id.to_bytes(4, "big"))
-            self._writer.write(len(payload).to_bytes(4, "big"))  # type: ignore
-            self._writer.write(payload)  # type: ignore
-            await self._writer.drain()
-
         data = await future
+        return self._build_response(data, resp_model, trusted)
 
-        return CallResponse[resp_model](**data)
-
-
-__rpc_client_instance: RPCClient | None = None
-
+    async def _call_many_once(
+        self,
+        calls: Sequence[RPCCall],
+        *,
+        unified_msg_origin: str,
+        trusted: bool,
+    ) -> list[CallResponse]:
+        await self.connect()
 
-def get_rpc_client(socket_path: Path = Path("/run/logic/logic.sock")) -> RPCClient:
-    global __rpc_client_instance
-    if __rpc_client_instance is None:
-        __rpc_client_instance = RPCClient(socket_path)
-    return __rpc_client_instance
+        futures: list[asyncio.Future] = []
+        try:
+            for module_id, method, params, _ in calls:
+                futures.append(
+                    await self._submit(
+                        module_id=module_id,
+                        method=method,
+                        params=params,
+                        unified_msg_origin=unified_msg_origin,
+                    )
+                )
+            results = await asyncio.gather(*futures)
+        except BaseException:
+            # 提交中途被取消/超时或部分请求失败时，取消其余请求以释放并发名额，
+            # 并取出已完成请求的异常，避免事件循环报告未处理的异常
+            for fut in futures:
+                if not fut.cancel() and not fut.cancelled():
+                    fut.exception()
+            raise
+        return [
+            self._build_response(data, resp_model, trusted)
+            for data, (*_, resp_model) in zip(results, calls)
+        ]
+
+
+_rpc_clients: dict[Path, RPCClient] = {}
+_default_client: RPCClient | None = None
+
+
+def get_rpc_client(socket_path: Path = DEFAULT_SOCKET_PATH) -> RPCClient:
+    """获取 RPC 客户端单例，同一 socket_path 始终返回同一个未关闭的实例."""
+    global _default_client
+    if socket_path is DEFAULT_SOCKET_PATH:
+        # 默认路径走快速路径，避免每次调用都构造并哈希 Path
+        client = _default_client
+        if client is None or client._closed:
+            client = _default_client = _rpc_client_for(DEFAULT_SOCKET_PATH)
+        return client
+    return _rpc_client_for(Path(socket_path))
+
+
+def _rpc_client_for(socket_path: Path) -> RPCClient:
+    # 路径已规范化，位置参数/关键字参数/默认值都会落到同一个键上
+    client = _rpc_clients.get(socket_path)
+    if client is None or client._closed:
+        # 插件卸载时会关闭客户端，重新加载后需要新的实例
+        client = _rpc_clients[socket_path] = RPCClient(socket_path)
+    return client